@@ -1,3 +1,7 @@
+{# Included by core.pyx for each typedef. Requires arithmetic_operations, as
+   returned by arithmetictags.generate_typedef_operations, and
+   arithmetictags.operator_map in the template context. #}
+{% set operations = arithmetic_operations[typedef.name] %}
 {% for op in operator_map %}
 {% set funcnames = operator_map[op] %}
 {% for funcname in funcnames %}
@@ -16,8 +20,8 @@
 {% endfor %}
 {% for ret, lhs, rhs, bcast in operations[op] %}
     cdef inline {{ ret.name }} _{{ funcnames[0] }}_{{ lhs.name }}_{{ rhs.name }}({{ lhs.name }} self, {{ rhs.name }} other):
-{% set layout_operand = "self" if "Lattice" in rhs.structure else ("other" if "Lattice" in lhs.structure else "") %}
-        cdef {{ ret.name }} out = {{ ret.name }}({% if "Lattice" in ret.structure %}{{ layout_operand }}.layout, {% endif %}{% if "Array" in ret.structure %}1{% endif %})
+{% set layout_operand = "self" if rhs.has_lattice else ("other" if lhs.has_lattice else "") %}
+        cdef {{ ret.name }} out = {{ ret.name }}({% if ret.has_lattice %}{{ layout_operand }}.layout, {% endif %}{% if ret.has_array %}1{% endif %})
         out.instance[0] = {{ lhs.accessor("self", False) }} {{ op }} {{ rhs.accessor("other", False) }}
         return out
 
@@ -86,5 +86,6 @@ cdef class {{ typedef.name }}:
 
 {{ typedef|buffer_code(precision) }}
 
-{{ typedef|arithmetic_code(typedefs) }}
+{% include "core/arithmetic.pyx" %}
+
 {% endfor %}
\ No newline at end of file
@@ -1,7 +1,7 @@
 {% if not typedef.is_static %}
     cdef int view_count
 {% endif %}
-{% if "Lattice" in typedef.structure %}
+{% if typedef.has_lattice %}
     cdef Layout layout
 {% endif %}
 {% if typedef.structure[0] == "Matrix" %}
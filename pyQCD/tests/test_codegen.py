@@ -0,0 +1,101 @@
+from __future__ import absolute_import
+
+import pytest
+
+from pyQCD.utils.codegen.arithmetictags import generate_matrix_operations
+from pyQCD.utils.codegen.typedefs import (ArrayDef, LatticeDef, MatrixDef,
+                                          TypeDef)
+
+
+def create_typedefs(name, shape):
+    """Create matrix, array, lattice and lattice array typedefs"""
+    complex_type = TypeDef("Complex", "Complex", "complex", False)
+    matrix = MatrixDef(name, name, name.lower(), shape, complex_type)
+    array = ArrayDef(name + "Array", name + "Array", name.lower() + "_array",
+                     matrix)
+    lattice_matrix = LatticeDef("Lattice" + name, "Lattice" + name,
+                                "lattice_" + name.lower(), matrix)
+    lattice_array = LatticeDef("Lattice" + name + "Array",
+                               "Lattice" + name + "Array",
+                               "lattice_" + name.lower() + "_array", array)
+    return [matrix, array, lattice_matrix, lattice_array]
+
+
+def get_typedefs(reverse):
+    """Create colour matrix and vector typedefs, optionally in reverse order"""
+    typedefs = (create_typedefs("ColourMatrix", (3, 3)) +
+                create_typedefs("ColourVector", (3,)))
+    return typedefs[::-1] if reverse else typedefs
+
+
+def get_result(typedefs, op, lhs_name, rhs_name):
+    """Look up the result type name of the specified operation"""
+    lookup = dict([(t.name, t) for t in typedefs])
+    operations = {'*': [], '/': [], '+': [], '-': []}
+    generate_matrix_operations(operations, lookup[lhs_name], typedefs)
+    results = [ret.name for ret, lhs, rhs, bcast in operations[op]
+               if rhs.name == rhs_name]
+    assert len(results) <= 1
+    return results[0] if results else None
+
+
+class TestMatrixDef(object):
+
+    def test_constructor(self):
+        """Test constructor"""
+        complex_type = TypeDef("Complex", "Complex", "complex", False)
+        matrix = MatrixDef("ColourMatrix", "ColourMatrix", "colour_matrix",
+                           (3, 3), complex_type)
+        assert matrix.size_expr == "9"
+        assert matrix.shape == (3, 3)
+        assert matrix.is_static
+        assert matrix.is_square
+
+        vector = MatrixDef("ColourVector", "ColourVector", "colour_vector",
+                           [3], complex_type)
+        assert vector.size_expr == "3"
+        assert vector.shape == (3,)
+        assert not vector.is_square
+
+
+@pytest.mark.parametrize("reverse", [False, True])
+class TestGenerateMatrixOperations(object):
+
+    def test_multiply(self, reverse):
+        """Test result types of multiplication"""
+        typedefs = get_typedefs(reverse)
+        expected = [
+            ("ColourMatrix", "ColourMatrix", "ColourMatrix"),
+            ("ColourMatrix", "ColourVector", "ColourVector"),
+            ("ColourMatrix", "ColourMatrixArray", "ColourMatrixArray"),
+            ("ColourMatrixArray", "ColourVector", "ColourVectorArray"),
+            ("LatticeColourMatrix", "LatticeColourMatrix",
+             "LatticeColourMatrix"),
+            ("LatticeColourMatrix", "LatticeColourVector",
+             "LatticeColourVector"),
+            ("LatticeColourMatrix", "LatticeColourMatrixArray",
+             "LatticeColourMatrixArray"),
+            ("LatticeColourMatrixArray", "LatticeColourVector",
+             "LatticeColourVectorArray"),
+            ("ColourVector", "ColourMatrix", None),
+            ("ColourMatrix", "LatticeColourMatrix", None),
+        ]
+        for lhs, rhs, result in expected:
+            assert get_result(typedefs, "*", lhs, rhs) == result
+
+    def test_add_sub(self, reverse):
+        """Test result types of addition and subtraction"""
+        typedefs = get_typedefs(reverse)
+        expected = [
+            ("ColourMatrix", "ColourMatrix", "ColourMatrix"),
+            ("ColourVectorArray", "ColourVectorArray", "ColourVectorArray"),
+            ("LatticeColourMatrix", "LatticeColourMatrix",
+             "LatticeColourMatrix"),
+            ("LatticeColourVectorArray", "LatticeColourVectorArray",
+             "LatticeColourVectorArray"),
+            ("ColourMatrix", "ColourMatrixArray", None),
+            ("ColourMatrix", "ColourVector", None),
+        ]
+        for op in "+-":
+            for lhs, rhs, result in expected:
+                assert get_result(typedefs, op, lhs, rhs) == result
@@ -7,21 +7,26 @@ from __future__ import absolute_import, print_function
 import os
 from collections import namedtuple
 from itertools import product
+from operator import attrgetter
 import shutil
 from string import ascii_lowercase
 
-from jinja2 import Environment, PackageLoader
+from jinja2 import Environment, FileSystemBytecodeCache, PackageLoader
 import setuptools
 
 from . import arithmetictags, coretags, ctags, typedefs
 from .typedefs import LatticeDef
 
 
-# Create the jinja2 template environment.
+# Create the jinja2 template environment. A bytecode cache is attached when
+# code generation is actually run; see generate_qcd.
 env = Environment(loader=PackageLoader('pyQCD', 'templates'),
                   trim_blocks=True, lstrip_blocks=True,
                   extensions=["jinja2.ext.do"])
 
+# Compiled templates, keyed on template name. See _get_template.
+_templates = {}
+
 MatrixDefinition = namedtuple("MatrixDefinition",
                               ["num_rows", "num_cols", "matrix_name",
                                "array_name", "lattice_matrix_name",
@@ -29,6 +34,10 @@ MatrixDefinition = namedtuple("MatrixDefinition",
 
 variants = ['matrix', 'array', 'lattice_matrix', 'lattice_array']
 
+# Accessors for the type name of each variant in a MatrixDefinition.
+_variant_name_getters = dict([(var, attrgetter("{}_name".format(var)))
+                              for var in variants])
+
 
 def _filter_lib(src, names):
     """Filters out C++ and Cython files from list of names"""
@@ -44,6 +53,15 @@ def _filter_lib(src, names):
     return out
 
 
+def _get_template(name):
+    """Load the named template, compiling it only the first time it's needed"""
+    try:
+        return _templates[name]
+    except KeyError:
+        template = _templates[name] = env.get_template(name)
+        return template
+
+
 def _camel2underscores(string):
     """Converts a string in titlecase or camelcase to underscores"""
     for char in ascii_lowercase:
@@ -152,7 +170,7 @@ def make_lattice_binary_ops(matrices, matrix_lhs, matrix_rhs):
         return []
     for vartrip in variant_triplets:
         lhs_name, rhs_name, ret_name = tuple([
-            getattr(mat, "{}_name".format(var))
+            _variant_name_getters[var](mat)
             for mat, var in zip([matrix_lhs, matrix_rhs, matrix_ret], vartrip)
         ])
         lhs_lattice = "lattice" in vartrip[0]
@@ -197,7 +215,7 @@ def make_scalar_binary_ops(matrix, precision, scalar_types):
     cpp_scalar_types.append("complex.Complex")
 
     for variant in variants:
-        typename = getattr(matrix, "{}_name".format(variant))
+        typename = _variant_name_getters[variant](matrix)
         typename = "{}.{}".format(_camel2underscores(typename), typename)
 
         for scalar in cpp_scalar_types:
@@ -229,7 +247,7 @@ def make_cython_ops(matrices, cpp_ops, precision, scalar_types):
 
     scalar_complex_types = scalar_types + ["Complex"]
 
-    out = dict([((getattr(mat, "{}_name".format(var)), op), [])
+    out = dict([((_variant_name_getters[var](mat), op), [])
                 for mat in matrices for var in variants
                 for op in '+-*/'])
     for ret_type, op, lhs_type, rhs_type, lhs_bcast, rhs_bcast in cpp_ops:
@@ -249,7 +267,7 @@ def write_core_template(template_fname, output_fname, output_path,
                         **template_args):
     """Load the specified template from templates/core and render it to core"""
 
-    template = env.get_template("core/{}".format(template_fname))
+    template = _get_template("core/{}".format(template_fname))
     path = os.path.join(output_path, output_fname)
     print("Writing pyQCD/templates/core/{} to {}".format(template_fname, path))
     with open(path, 'w') as f:
@@ -270,6 +288,7 @@ def generate_cython_types(output_path, precision, typedefs):
       typdefs (iterable): An iterable object containing instances of TypeDef.
     """
     operations = {'*': [], '/': [], '+': [], '-': []}
+    typedef_operations = arithmetictags.generate_typedef_operations(typedefs)
 
     for typedef in typedefs:
         template_fname = typedef.structure[0].lower()
@@ -282,7 +301,8 @@ def generate_cython_types(output_path, precision, typedefs):
         write_core_template(template_fname + ".pxd", typedef.cmodule + ".pxd",
                             output_path, precision=precision, typedef=typedef,
                             bcast_typedef=bcast_typedef)
-        arithmetictags.generate_matrix_operations(operations, typedef, typedefs)
+        for op, typedef_ops in typedef_operations[typedef.name].items():
+            operations[op].extend(typedef_ops)
 
     write_core_template("types.hpp", "types.hpp", output_path,
                         typedefs=typedefs, precision=precision)
@@ -292,7 +312,9 @@ def generate_cython_types(output_path, precision, typedefs):
                         operations=operations, typedefs=typedefs,
                         precision=precision)
     write_core_template("core.pyx", "core.pyx", output_path,
-                        typedefs=typedefs, precision=precision)
+                        typedefs=typedefs, precision=precision,
+                        arithmetic_operations=typedef_operations,
+                        operator_map=arithmetictags.operator_map)
 
 
 def generate_qcd(num_colours, precision, representation, dest=None):
@@ -310,6 +332,12 @@ def generate_qcd(num_colours, precision, representation, dest=None):
         Defaults to the lib directory in the project root directory.
     """
 
+    # Cache compiled templates on disk so that subsequent runs needn't
+    # recompile them from source. With no directory specified, jinja2 uses a
+    # per-user cache directory that only the current user can access.
+    if env.bytecode_cache is None:
+        env.bytecode_cache = FileSystemBytecodeCache()
+
     constants = [("constexpr int", "num_colours", 3)]
 
     type_definitions = []
@@ -367,5 +395,4 @@ env.filters['allocation_code'] = coretags.allocation_code
 env.filters['setget_code'] = coretags.setget_code
 env.filters['buffer_code'] = coretags.buffer_code
 env.filters['member_func_code'] = coretags.member_func_code
-env.filters['arithmetic_code'] = arithmetictags.arithmetic_code
 env.globals.update(zip=zip, len=len, hasattr=hasattr)
@@ -1,7 +1,12 @@
 """This module contains template tags for generating arithmetic operations
 for the specified Cython types."""
 
-from .typedefs import ArrayDef, LatticeDef, TypeDef
+from .typedefs import TypeDef, intern_shape
+
+
+# Python special method names corresponding to each arithmetic operator.
+operator_map = {"*": ["mul"], "/": ["div", "truediv"],
+                "+": ["add"], "-": ["sub"]}
 
 
 def scalar_typedefs(precision):
@@ -11,13 +16,20 @@ def scalar_typedefs(precision):
             TypeDef("Complex", "Complex", "complex", False)]
 
 
-def filter_types(typedef, matrix_shape, is_array, is_lattice):
-    """Determine whether supplied typedef fits the specified requirements"""
-    correct_shape = typedef.matrix_shape == matrix_shape
-    is_array_correct = (isinstance(typedef, ArrayDef) == is_array or
-                        isinstance(typedef.element_type, ArrayDef))
-    is_lattice_correct = isinstance(typedef, LatticeDef) == is_lattice
-    return correct_shape and is_array_correct and is_lattice_correct
+def typedef_key(typedef):
+    """Key identifying the shape and container kind of the supplied typedef"""
+    return typedef.matrix_shape, typedef.is_array_flag, typedef.is_lattice_flag
+
+
+def make_result_map(typedefs):
+    """Index the supplied typedefs by typedef_key for result type lookups.
+
+    Where several typedefs share a key, the first one is used.
+    """
+    result_map = {}
+    for typedef in typedefs:
+        result_map.setdefault(typedef_key(typedef), typedef)
+    return result_map
 
 
 def generate_scalar_operations(operations, typedef, scalar_typedefs):
@@ -39,7 +51,7 @@ def generate_scalar_operations(operations, typedef, scalar_typedefs):
     return operations
 
 
-def generate_matrix_operations(operations, lhs, rhss):
+def generate_matrix_operations(operations, lhs, rhss, result_map=None):
     """Generate a list of tuples specifying operations and operand types.
 
     Args:
@@ -49,35 +61,36 @@ def generate_matrix_operations(operations, lhs, rhss):
         generate operations for.
       other_typedefs (iterable): An iterable of ContainerDef instances to
         compare the supplied typedef variable against.
+      result_map (dict, optional): The typedefs that may be returned by the
+        operations, as returned by make_result_map. Built from rhss if not
+        supplied.
     """
-    lhs_is_lattice = isinstance(lhs, LatticeDef)
-    lhs_is_array = (isinstance(lhs, ArrayDef) or
-                    isinstance(lhs.element_type, ArrayDef))
+    lhs_is_lattice = lhs.is_lattice_flag
+    lhs_is_array = lhs.is_array_flag
+    lhs_shape = lhs.matrix_shape
+
+    if result_map is None:
+        result_map = make_result_map(rhss)
 
     for rhs in rhss:
-        rhs_is_lattice = isinstance(rhs, LatticeDef)
-        rhs_is_array = (isinstance(rhs, ArrayDef) or
-                        isinstance(rhs.element_type, ArrayDef))
+        rhs_is_lattice = rhs.is_lattice_flag
+        rhs_is_array = rhs.is_array_flag
         if rhs_is_lattice != lhs_is_lattice:
             continue
+        rhs_shape = rhs.matrix_shape
         result_is_lattice = lhs_is_lattice or rhs_is_lattice
         result_is_array = lhs_is_array or rhs_is_array
-        try:
-            result_shape = lhs.matrix_shape[0], rhs.matrix_shape[1]
-        except IndexError:
-            result_shape = lhs.matrix_shape[0],
-        filter_args = result_shape, result_is_array, result_is_lattice
-        try:
-            result_typedef = [e for e in rhss
-                              if filter_types(e, *filter_args)][0]
-        except IndexError:
+        if len(rhs_shape) > 1:
+            result_shape = intern_shape((lhs_shape[0], rhs_shape[1]))
+        else:
+            result_shape = intern_shape((lhs_shape[0],))
+        result_typedef = result_map.get(
+            (result_shape, result_is_array, result_is_lattice))
+        if result_typedef is None:
             continue
-        try:
-            can_multiply = lhs.matrix_shape[1] == rhs.matrix_shape[0]
-        except IndexError:
-            can_multiply = False
-        can_addsub = (lhs.matrix_shape == rhs.matrix_shape and
-                      lhs_is_array == rhs_is_array)
+        can_multiply = (len(lhs_shape) > 1 and len(rhs_shape) > 0 and
+                        lhs_shape[1] == rhs_shape[0])
+        can_addsub = lhs_shape == rhs_shape and lhs_is_array == rhs_is_array
 
         if can_multiply:
             operations["*"].append((result_typedef, lhs, rhs, None))
@@ -88,24 +101,29 @@ def generate_matrix_operations(operations, lhs, rhss):
     return operations
 
 
-def arithmetic_code(typedef, typedefs):
-    """Generate code for constructors and destructors.
+def generate_typedef_operations(typedefs):
+    """Generate the matrix operations for each of the supplied typedefs.
 
     Args:
-      typedef (ContainerDef): A ContainerDef instance specifying the type to
-        generate code for.
-      typedefs (iterable): An iterable of ContainerDef instances to compare
-        the specified typedef to.
-      precision (str): String specifying the fundamental real numerical type.
+      typedefs (iterable): An iterable of ContainerDef instances specifying
+        the types to generate operations for.
+
+    Returns:
+      dict: Maps each typedef name to a dictionary of the operations with that
+        typedef as the left hand operand, as per generate_matrix_operations.
     """
-    operator_map = {"*": ["mul"], "/": ["div", "truediv"],
-                    "+": ["add"], "-": ["sub"]}
-    operations = {'*': [], '/': [], '+': [], '-': []}
-    complex_types = {'*': True, '/': True, '+': False, '-': False}
-    generate_matrix_operations(operations, typedef, typedefs)
-
-    from . import env
-    template = env.get_template("core/arithmetic.pyx")
-    return template.render(typedef=typedef, operations=operations,
-                           operator_map=operator_map,
-                           lhs_complex=complex_types, rhs_complex=complex_types)
+    out = {}
+    result_map = make_result_map(typedefs)
+    # Lattice types only combine with other lattice types, and likewise for
+    # non-lattice types, so only pair each typedef with compatible ones.
+    compatible_typedefs = {True: [], False: []}
+    for typedef in typedefs:
+        compatible_typedefs[typedef.is_lattice_flag].append(typedef)
+
+    for typedef in typedefs:
+        operations = {'*': [], '/': [], '+': [], '-': []}
+        out[typedef.name] = generate_matrix_operations(
+            operations, typedef, compatible_typedefs[typedef.is_lattice_flag],
+            result_map)
+    return out
+
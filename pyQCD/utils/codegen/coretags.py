@@ -1,7 +1,7 @@
 """This module contains functions for generating attribute and member function
 code for each of the core types in core.pyx"""
 
-from .typedefs import ArrayDef, LatticeDef, MatrixDef
+from .typedefs import MatrixDef
 
 
 def allocation_code(typedef):
@@ -11,18 +11,18 @@ def allocation_code(typedef):
       typedef (ContainerDef): A ContainerDef instance specifying the type to
         generate code for.
     """
-    from . import env
-    template = env.get_template("core/allocation.pyx")
+    from . import _get_template
+    template = _get_template("core/allocation.pyx")
 
     args = []
-    if "Lattice" in typedef.structure:
+    if typedef.has_lattice:
         args.append(("Layout", "layout", ".instance[0]"))
-    if "Array" in typedef.structure:
+    if typedef.has_array:
         args.append(("int", "size", ""))
 
     rhs = "zeros"
 
-    for i, tdef in enumerate(typedef.unpack()[::-1]):
+    for tdef in reversed(typedef.unpack()):
         rhs = tdef.static_alloc_temp.format(rhs)
 
     argstring = ", ".join([" ".join(a[:2]) for a in args])
@@ -42,8 +42,8 @@ def setget_code(typedef, precision):
       precision (str): The fundamental machine type for representing real
         numbers.
     """
-    from . import env
-    template = env.get_template("core/setget.pyx")
+    from . import _get_template
+    template = _get_template("core/setget.pyx")
     return template.render(typedef=typedef, precision=precision)
 
 
@@ -56,31 +56,32 @@ def buffer_code(typedef, precision):
       precision (str): The fundamental machine type for representing real
         numbers.
     """
-    from . import env
-    template = env.get_template("core/buffer.pyx")
+    from . import _get_template
+    template = _get_template("core/buffer.pyx")
 
-    stride_length = "itemsize"
+    stride_factors = ["itemsize"]
     inst_ref = typedef.accessor("self")
     buffer_info = []
     types = typedef.unpack()
-    it = enumerate(types)
 
-    for depth, tdef in reversed(list(it)):
+    for depth in range(len(types) - 1, -1, -1):
+        tdef = types[depth]
+        stride_length = " * ".join(stride_factors)
         if type(tdef) is MatrixDef:
             buffer_info.append((stride_length, tdef.shape[0]))
             if len(tdef.shape) > 1:
                 buffer_info.insert(0,
                                    (stride_length + " * " + str(tdef.shape[1]),
                                     tdef.shape[1]))
-            stride_length += " * {}".format(tdef.size_expr)
+            stride_factors.append(tdef.size_expr)
         else:
             size_expr = inst_ref + "[0]" * depth + "." + tdef.size_expr
             buffer_info.append((stride_length, size_expr))
-            stride_length += " * {}".format(size_expr)
+            stride_factors.append(size_expr)
 
     return template.render(typedef=typedef, precision=precision,
                            buffer_info=buffer_info[::-1],
-                           buffer_size=stride_length)
+                           buffer_size=" * ".join(stride_factors))
 
 
 def member_func_code(typedef):
@@ -90,30 +91,24 @@ def member_func_code(typedef):
       typedef (ContainerDef): A ContainerDef instance specifying the type to
         generate code for.
     """
-    from . import env
-    template = env.get_template("core/member_funcs.pyx")
-    try:
-        is_square = typedef.matrix_shape[0] == typedef.matrix_shape[1]
-    except IndexError:
-        is_square = False
-    funcnames = ["zeros", "ones"] + (["identity"] if is_square else [])
+    from . import _get_template
+    template = _get_template("core/member_funcs.pyx")
+    funcnames = ["zeros", "ones"] + (["identity"] if typedef.is_square else [])
 
     args = []
-    if "Lattice" in typedef.structure:
+    if typedef.has_lattice:
         args.append(("Layout", "layout"))
-    if "Array" in typedef.structure:
+    if typedef.has_array:
         args.append(("int", "size"))
 
     rhs = ""
 
-    for i, tdef in enumerate(typedef.unpack()[::-1]):
-        cname = "{}.{}".format(tdef.cmodule, tdef.cname)
+    for tdef in reversed(typedef.unpack()):
         if type(tdef) is MatrixDef:
             rhs = "{}.{{}}()".format(tdef.cmodule)
-        if type(tdef) is ArrayDef:
-            rhs = "{}(size, {})".format(cname, rhs)
-        if type(tdef) is LatticeDef:
-            rhs = "{}(layout.instance[0], {})".format(cname, rhs)
+        else:
+            # Array and lattice constructors match their allocation templates
+            rhs = tdef.static_alloc_temp.format(rhs)
     static_assign_line = "out.instance[0] = {}".format(rhs)
 
     argstring = ", ".join([" ".join(a) for a in args])
@@ -3,10 +3,60 @@ which is used to produce Cython syntax trees for the various types."""
 
 from __future__ import absolute_import
 
+import functools
+from operator import mul
+import re
+
+
+def cached_property(func):
+    """Create a read-only property that is computed once per instance.
+
+    The computed value is stored in the instance's _cache dictionary, so it's
+    only suitable for values that don't change after construction. Instances
+    must provide the _cache attribute.
+    """
+    name = func.__name__
+
+    @functools.wraps(func)
+    def getter(self):
+        try:
+            return self._cache[name]
+        except KeyError:
+            value = self._cache[name] = func(self)
+            return value
+
+    return property(getter)
+
+
+# Canonical instances of matrix shape tuples. See intern_shape.
+_shapes = {}
+
+
+def intern_shape(shape):
+    """Return the canonical tuple instance for the supplied matrix shape.
+
+    Equal shapes share a single tuple object, which keeps the shape tuples
+    built in the operation generation loops cheap to hash and compare.
+    """
+    shape = tuple(shape)
+    return _shapes.setdefault(shape, shape)
+
+
+# Matches numerical literals and tuples or lists of them. See _is_literal.
+_LITERAL_RE = re.compile(r"^[\s\d,\(\)\[\]\+\-\*]+$")
+
+
+def _is_literal(expr):
+    """Determine whether the supplied expression is a numerical literal (or
+    tuple of literals) rather than the name of a C++ member function."""
+    return _LITERAL_RE.match(expr) is not None
+
 
 class TypeDef(object):
     """Encapsulates type defintion and facilitates cython node generation."""
 
+    __slots__ = ("name", "cname", "cmodule", "wrap_ptr", "builtin", "_cache")
+
     def __init__(self, name, cname, cmodule, wrap_ptr, builtin=False):
         """Constructor for TypeDef object, See help(TypeDef)."""
         self.name = name
@@ -14,6 +64,7 @@ class TypeDef(object):
         self.cmodule = cmodule
         self.wrap_ptr = wrap_ptr
         self.builtin = builtin
+        self._cache = {}
 
     def accessor(self, varname, broadcast=False):
         if self.builtin:
@@ -28,6 +79,11 @@ class ContainerDef(TypeDef):
     """Encapsulates container definition and facilitates cython node generation.
     """
 
+    __slots__ = ("element_type", "size_expr", "ndims_expr", "structure",
+                 "has_lattice", "has_array", "static_alloc_temp",
+                 "is_lattice_flag", "is_array_flag", "is_square",
+                 "buffer_ndims", "_shape_expr", "is_static")
+
     def __init__(self, name, cname, cmodule, size_expr, shape_expr, ndims_expr,
                  buffer_ndims, element_type, static_alloc_temp):
         """Constructor for ContainerDef object. See help(ContainerDef)"""
@@ -35,34 +91,31 @@ class ContainerDef(TypeDef):
         self.element_type = element_type
         self.size_expr = size_expr
         self.ndims_expr = ndims_expr
-        self.structure = [self.__class__.__name__.replace("Def", "")]
+        self.structure = (self.__class__.__name__.replace("Def", ""),)
         self.static_alloc_temp = static_alloc_temp
         if isinstance(element_type, ContainerDef):
-            self.structure.extend(element_type.structure)
+            self.structure += element_type.structure
+        self.has_lattice = "Lattice" in self.structure
+        self.has_array = "Array" in self.structure
+        self.is_lattice_flag = isinstance(self, LatticeDef)
+        self.is_array_flag = (isinstance(self, ArrayDef) or
+                              getattr(element_type, "is_array_flag", False))
+        self.is_square = getattr(element_type, "is_square", False)
         try:
             self.buffer_ndims = element_type.buffer_ndims + buffer_ndims
         except AttributeError:
             self.buffer_ndims = buffer_ndims
-        try:
-            eval(shape_expr)
-        except NameError:
-            self._shape_expr = "self.instance[0].{}".format(shape_expr)
-        else:
+        if _is_literal(shape_expr):
             self._shape_expr = shape_expr
-        try:
-            eval(ndims_expr)
-        except NameError:
-            self.ndims_expr = "self.instance[0].{}".format(ndims_expr)
         else:
+            self._shape_expr = "self.instance[0].{}".format(shape_expr)
+        if _is_literal(ndims_expr):
             self.ndims_expr = ndims_expr
-        try:
-            int(size_expr)
-        except ValueError:
-            self.is_static = False
         else:
-            self.is_static = True
+            self.ndims_expr = "self.instance[0].{}".format(ndims_expr)
+        self.is_static = isinstance(size_expr, int) or size_expr.isdigit()
 
-    @property
+    @cached_property
     def matrix_shape(self):
         """The shape of the root child element type, if it exists"""
         if isinstance(self, MatrixDef):
@@ -70,16 +123,19 @@ class ContainerDef(TypeDef):
         else:
             return self.element_type.matrix_shape
 
-    def unpack(self):
-        """Returns a list of TypeDef instances"""
-        out = [self]
+    @cached_property
+    def _unpacked(self):
+        """Tuple of this TypeDef and its nested element TypeDefs"""
         try:
-            out.extend(self.element_type.unpack())
+            return (self,) + self.element_type._unpacked
         except AttributeError:
-            pass
-        return out
+            return (self,)
 
-    @property
+    def unpack(self):
+        """Returns a list of TypeDef instances"""
+        return list(self._unpacked)
+
+    @cached_property
     def shape_expr(self):
         """Generate expression for the shape of this container"""
         out = self.wrap_shape_expr(self._shape_expr)
@@ -98,14 +154,16 @@ class ContainerDef(TypeDef):
 class MatrixDef(ContainerDef):
     """Specialise container definition for matrix type"""
 
+    __slots__ = ("shape", "is_matrix")
+
     def __init__(self, name, cname, cmodule, shape, element_type):
         """Constructor for MatrixDef object. See help(MatrixDef)"""
-        size = reduce(lambda x, y: x * y, shape)
+        size = functools.reduce(mul, shape, 1)
         super(MatrixDef, self).__init__(
             name, cname, cmodule, str(size), str(shape), str(len(shape)),
             len(shape), element_type,
             "{}.{}({}.{{}}())".format(cmodule, cname, cmodule))
-        self.shape = shape
+        self.shape = intern_shape(shape)
         self.is_matrix = len(self.shape) == 2
         self.is_square = self.is_matrix and self.shape[0] == self.shape[1]
 
@@ -113,6 +171,8 @@ class MatrixDef(ContainerDef):
 class ArrayDef(ContainerDef):
     """Specialise container definition for array type"""
 
+    __slots__ = ()
+
     def __init__(self, name, cname, cmodule, element_type):
         """Constructor for ArrayDef object. See help(ArrayDef)."""
         super(ArrayDef, self).__init__(
@@ -127,6 +187,8 @@ class ArrayDef(ContainerDef):
 class LatticeDef(ContainerDef):
     """Specialise container definition for lattice type"""
 
+    __slots__ = ()
+
     def __init__(self, name, cname, cmodule, element_type):
         """Constructor for LatticeDef object. See help(LatticeDef)"""
         super(LatticeDef, self).__init__(
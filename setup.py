@@ -1,8 +1,6 @@
 from itertools import product
 import sys
 
-from Cython.Build import cythonize
-from Cython.Compiler.Errors import CompileError
 from setuptools import Extension, setup, find_packages
 from setuptools.command.test import test as TestCommand
 
@@ -32,10 +30,12 @@ extensions = [Extension("pyQCD.core.core", ["pyQCD/core/core.pyx"],
                         extra_compile_args=["-std=c++11"])]
 
 # Do not rebuild on change of extension module in the case where we're
-# regenerating the code (in case of errors)
+# regenerating the code (in case of errors). The Cython compiler is only
+# imported when it's actually needed.
 if "codegen" in sys.argv:
     ext_modules = []
 else:
+    from Cython.Build import cythonize
     ext_modules = cythonize(extensions)
 
 